@@ -6,17 +6,16 @@ from twilio.rest import Client
 from dotenv import load_dotenv
 from pathlib import Path
 from pytz import timezone
+import eventos
 
 # ========== INÍCIO ==========
-print("🟢 app.py rodando...")
-
 def agora_br():
     return datetime.now(timezone("America/Sao_Paulo"))
 
-def log(msg):
-    print(f"[{agora_br().strftime('%Y-%m-%d %H:%M:%S')}] {msg}")
+# verificar_horarios loga "nenhum_agendado" a cada chamada sem alerta; só 1 a cada 60 chega ao log.
+eventos.configurar("nenhum_agendado", amostragem=60)
 
-log("🚀 app.py está rodando normalmente no Render!")
+eventos.info("processo_iniciado", "🚀 app.py está rodando normalmente no Render!")
 
 # ========== AMBIENTE ==========
 env_path = Path(__file__).parent / ".env"
@@ -27,10 +26,12 @@ TWILIO_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
 TWILIO_NUMBER = os.getenv("TWILIO_NUMBER")
 DESTINO = os.getenv("DESTINO")
 
-print("🔍 TWILIO_ACCOUNT_SID:", TWILIO_SID)
-print("🔍 TWILIO_AUTH_TOKEN:", TWILIO_TOKEN)
-print("🔍 TWILIO_NUMBER:", TWILIO_NUMBER)
-print("🔍 DESTINO:", DESTINO)
+eventos.info("ambiente_carregado", variaveis={
+    "TWILIO_ACCOUNT_SID": bool(TWILIO_SID),
+    "TWILIO_AUTH_TOKEN": bool(TWILIO_TOKEN),
+    "TWILIO_NUMBER": bool(TWILIO_NUMBER),
+    "DESTINO": bool(DESTINO),
+})
 
 if not all([TWILIO_SID, TWILIO_TOKEN, TWILIO_NUMBER, DESTINO]):
     raise EnvironmentError("⚠️ Variáveis de ambiente do Twilio não configuradas corretamente.")
@@ -41,9 +42,9 @@ client = Client(TWILIO_SID, TWILIO_TOKEN)
 def enviar_mensagem(mensagem):
     try:
         client.messages.create(from_=TWILIO_NUMBER, to=DESTINO, body=mensagem)
-        log(f"[✅ ENVIADO] {mensagem}")
+        eventos.info("mensagem_enviada", mensagem)
     except Exception as e:
-        log(f"[❌ ERRO AO ENVIAR WHATSAPP] {e}")
+        eventos.erro("erro_envio", str(e), texto=mensagem)
 
 def carregar_json(caminho):
     if os.path.exists(caminho):
@@ -51,7 +52,7 @@ def carregar_json(caminho):
             with open(caminho, "r", encoding="utf-8") as f:
                 return json.load(f)
         except Exception as e:
-            log(f"[❌ ERRO AO LER {caminho}] {e}")
+            eventos.erro("erro_leitura", str(e), arquivo=caminho)
     return [] if "remedios" in caminho else {"confirmacoes": [], "pendencias": []}
 
 def salvar_json(caminho, conteudo):
@@ -91,7 +92,7 @@ def registrar_pendencia(remedio, hora):
         if p["remedio"] == remedio["nome"] and p["data"] == data_hoje and p["horario"] == hora:
             p["tentativas"] += 1
             salvar_json("historico.json", historico)
-            log(f"[🔁 PENDÊNCIA ATUALIZADA] {p}")
+            eventos.info("pendencia_atualizada", pendencia=dict(p))
             return
 
     nova = {
@@ -104,7 +105,7 @@ def registrar_pendencia(remedio, hora):
     pendencias.append(nova)
     historico["pendencias"] = pendencias
     salvar_json("historico.json", historico)
-    log(f"[📝 PENDÊNCIA REGISTRADA] {nova}")
+    eventos.info("pendencia_registrada", pendencia=dict(nova))
 
 def notificar_remedio(remedio, hora, tipo_aviso):
     periodo = next((f" ({h['periodo']})" for h in remedio.get("horarios", []) if h["hora"] == hora and "periodo" in h), "")
@@ -133,7 +134,7 @@ def verificar_horarios(remedios):
                     notificou = True
 
     if not notificou:
-        log("🔍 Nenhum remédio agendado neste minuto.")
+        eventos.info("nenhum_agendado", "🔍 Nenhum remédio agendado neste minuto.", hora=hora_atual)
 
 def verificar_pendentes_do_dia(remedios, historico, data):
     pendentes = []
@@ -152,7 +153,7 @@ def verificar_pendentes_do_dia(remedios, historico, data):
 
 # ========== EXECUÇÃO ==========
 def iniciar():
-    log("🚀 app.py iniciou normalmente!")
+    eventos.info("execucao_iniciada", "🚀 app.py iniciou normalmente!")
     agora = agora_br()
     enviar_mensagem(f"{saudacao_horario()}! Agora são {agora.strftime('%H:%M')}. Vamos iniciar o dia!")
 
@@ -0,0 +1,227 @@
+import os
+import re
+import sys
+import json
+import time
+import queue
+import atexit
+import threading
+from collections import deque
+from glob import glob
+from datetime import datetime
+from pathlib import Path
+from pytz import timezone
+
+# ========== CONFIGURAÇÃO ==========
+NIVEIS = {"debug": 10, "info": 20, "aviso": 30, "erro": 40}
+NIVEL_MINIMO = NIVEIS.get(os.getenv("LOG_NIVEL", "info").lower(), NIVEIS["info"])
+TAMANHO_BUFFER = int(os.getenv("LOG_BUFFER", "1000"))
+TAMANHO_FILA = 10000
+PROCESSO = Path(sys.argv[0]).stem or "python"
+FUSO = timezone("America/Sao_Paulo")
+# Cada processo (app, main, reenvio, webhook) também grava num NDJSON próprio,
+# com tamanho limitado, para que /debug/events consiga juntar todos.
+LOG_DIR = os.getenv("LOG_DIR", "logs")
+LIMITE_ARQUIVO = int(os.getenv("LOG_ARQUIVO_BYTES", str(256 * 1024)))
+ARQUIVO_PROCESSO = os.path.join(LOG_DIR, "eventos-" + re.sub(r"[^\w-]", "_", PROCESSO) + ".ndjson")
+
+# ========== ESTADO ==========
+_buffer = deque(maxlen=TAMANHO_BUFFER)
+_fila = queue.Queue(maxsize=TAMANHO_FILA)
+_regras = {}
+_contadores = {}
+_lock = threading.Lock()
+_escritor = None
+_descartados = 0
+_FIM = object()
+
+
+# ========== REGRAS ==========
+def configurar(tipo, limite=None, janela=60, amostragem=None):
+    """Define limite (máx. eventos por janela em segundos) e/ou amostragem (1 a cada N) para um tipo."""
+    with _lock:
+        _regras[tipo] = {"limite": limite, "janela": janela, "amostragem": amostragem}
+        _contadores.pop(tipo, None)
+
+def _passa_filtro(tipo, agora):
+    """Devolve None se o evento deve ser descartado, ou quantos foram suprimidos antes dele."""
+    regra = _regras.get(tipo)
+    if regra is None:
+        return 0
+    with _lock:
+        c = _contadores.setdefault(tipo, {"vistos": 0, "inicio": agora, "na_janela": 0, "suprimidos": 0})
+        c["vistos"] += 1
+        if regra["amostragem"] and (c["vistos"] - 1) % regra["amostragem"]:
+            c["suprimidos"] += 1
+            return None
+        if regra["limite"] is not None:
+            if agora - c["inicio"] >= regra["janela"]:
+                c["inicio"], c["na_janela"] = agora, 0
+            if c["na_janela"] >= regra["limite"]:
+                c["suprimidos"] += 1
+                return None
+            c["na_janela"] += 1
+        suprimidos, c["suprimidos"] = c["suprimidos"], 0
+        return suprimidos
+
+
+# ========== EMISSÃO ==========
+def emitir(nivel, tipo, mensagem="", **campos):
+    """Registra um evento sem bloquear: vai para o buffer em memória e para a fila do escritor."""
+    global _descartados
+    if NIVEIS[nivel] < NIVEL_MINIMO:
+        return
+    agora = time.time()
+    suprimidos = _passa_filtro(tipo, agora)
+    if suprimidos is None:
+        return
+
+    evento = {"ts": agora, "nivel": nivel, "tipo": tipo, "processo": PROCESSO, "mensagem": mensagem, **campos}
+    if suprimidos:
+        evento["suprimidos"] = suprimidos
+    _buffer.append(evento)
+
+    _iniciar_escritor()
+    try:
+        _fila.put_nowait(evento)
+    except queue.Full:
+        with _lock:
+            _descartados += 1
+
+def debug(tipo, mensagem="", **campos):
+    emitir("debug", tipo, mensagem, **campos)
+
+def info(tipo, mensagem="", **campos):
+    emitir("info", tipo, mensagem, **campos)
+
+def aviso(tipo, mensagem="", **campos):
+    emitir("aviso", tipo, mensagem, **campos)
+
+def erro(tipo, mensagem="", **campos):
+    emitir("erro", tipo, mensagem, **campos)
+
+
+# ========== CONSULTA ==========
+def formatar(evento):
+    return {**evento, "ts": datetime.fromtimestamp(evento["ts"], FUSO).isoformat(timespec="milliseconds")}
+
+def serializar(evento):
+    """Linha JSON do evento; campos que não são JSON viram str em vez de quebrar."""
+    return json.dumps(formatar(evento), ensure_ascii=False, default=str)
+
+def _momento(evento):
+    try:
+        return datetime.fromisoformat(evento["ts"])
+    except (TypeError, ValueError):
+        return datetime.fromtimestamp(0, FUSO)
+
+def _filtra(evento, minimo, tipo):
+    return NIVEIS.get(evento.get("nivel"), 0) >= minimo and (not tipo or evento.get("tipo") == tipo)
+
+def _eventos_de_outros_processos(limite, minimo, tipo):
+    for caminho in sorted(glob(os.path.join(LOG_DIR, "eventos-*.ndjson"))):
+        if os.path.abspath(caminho) == os.path.abspath(ARQUIVO_PROCESSO):
+            continue
+        ultimos = deque(maxlen=limite)
+        for arquivo in (f"{caminho}.1", caminho):
+            try:
+                with open(arquivo, "r", encoding="utf-8") as f:
+                    for linha in f:
+                        try:
+                            evento = json.loads(linha)
+                        except ValueError:
+                            continue  # linha cortada no meio de uma escrita
+                        if isinstance(evento, dict) and "ts" in evento and _filtra(evento, minimo, tipo):
+                            ultimos.append(evento)
+            except OSError:
+                continue
+        yield from ultimos
+
+def recentes(limite=100, nivel=None, tipo=None):
+    """Eventos mais recentes de todos os processos (do mais novo para o mais antigo).
+
+    Os deste processo vêm do buffer em memória; os dos outros, dos arquivos em LOG_DIR.
+    """
+    minimo = NIVEIS.get(nivel, 0)
+    proprios = []
+    for evento in reversed(list(_buffer)):
+        if _filtra(evento, minimo, tipo):
+            proprios.append(json.loads(serializar(evento)))
+            if len(proprios) >= limite:
+                break
+    todos = proprios + list(_eventos_de_outros_processos(limite, minimo, tipo))
+    todos.sort(key=_momento, reverse=True)
+    return todos[:limite]
+
+def estatisticas():
+    return {"buffer": len(_buffer), "capacidade": TAMANHO_BUFFER, "fila": _fila.qsize(), "descartados": _descartados}
+
+
+# ========== ESCRITOR EM SEGUNDO PLANO ==========
+def _escrever():
+    global _descartados
+    fim = False
+    while not fim:
+        evento = _fila.get()
+        linhas = []
+        if evento is _FIM:
+            fim = True
+        else:
+            linhas.append(evento)
+        # Junta o que já estiver na fila para fazer um único write/flush.
+        while not fim and len(linhas) < 500:
+            try:
+                proximo = _fila.get_nowait()
+            except queue.Empty:
+                break
+            if proximo is _FIM:
+                fim = True
+                break
+            linhas.append(proximo)
+        # Ao encerrar também reporta descartes que aconteceram depois do último lote.
+        with _lock:
+            descartados, _descartados = _descartados, 0
+        if descartados:
+            linhas.append({"ts": time.time(), "nivel": "aviso", "tipo": "eventos_descartados",
+                           "processo": PROCESSO, "mensagem": "", "quantidade": descartados})
+        if not linhas:
+            continue
+        texto = "".join(serializar(e) + "\n" for e in linhas)
+        try:
+            sys.stdout.write(texto)
+            sys.stdout.flush()
+        except Exception:
+            pass
+        _gravar_arquivo(texto)
+
+def _gravar_arquivo(texto):
+    """Acrescenta ao NDJSON do processo; passando do limite, vira .1 e começa outro."""
+    try:
+        os.makedirs(LOG_DIR, exist_ok=True)
+        with open(ARQUIVO_PROCESSO, "a", encoding="utf-8") as f:
+            f.write(texto)
+            tamanho = f.tell()
+        if tamanho > LIMITE_ARQUIVO:
+            os.replace(ARQUIVO_PROCESSO, f"{ARQUIVO_PROCESSO}.1")
+    except OSError:
+        pass
+
+def _iniciar_escritor():
+    global _escritor
+    if _escritor is not None:
+        return
+    with _lock:
+        if _escritor is None:
+            _escritor = threading.Thread(target=_escrever, name="eventos", daemon=True)
+            _escritor.start()
+            atexit.register(encerrar)
+
+def encerrar(timeout=2):
+    """Esvazia a fila antes de o processo sair."""
+    if _escritor is None or not _escritor.is_alive():
+        return
+    try:
+        _fila.put(_FIM, timeout=timeout)
+    except queue.Full:
+        return
+    _escritor.join(timeout)
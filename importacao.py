@@ -0,0 +1,438 @@
+import os
+import csv
+import sys
+import re
+import json
+import time
+import tempfile
+import threading
+import unicodedata
+from datetime import date, datetime
+
+# ========== ARQUIVOS ==========
+REMEDIOS_ARQUIVO = "remedios.json"
+HISTORICO_ARQUIVO = "historico.json"
+
+# ========== CONSTANTES ==========
+FREQUENCIAS_VALIDAS = ("diario", "semanal")
+CAMPOS_CSV = ["id", "nome", "principio_ativo", "dosagem", "horarios",
+              "frequencia", "data_inicio", "duracao_meses", "obs"]
+LIMITE_ERROS_GUARDADOS = 100
+TAMANHO_BLOCO = 64 * 1024
+_lock_catalogo = threading.Lock()
+HORA_REGEX = re.compile(r"(?:[01]\d|2[0-3]):[0-5]\d")
+ESPACOS_REGEX = re.compile(r"\s*")
+NUMERO_REGEX = re.compile(r"[-+.eE\d]*")
+DECODER = json.JSONDecoder()
+
+
+class ErroValidacao(ValueError):
+    def __init__(self, mensagem, resultado=None):
+        super().__init__(mensagem)
+        self.resultado = resultado
+
+
+# ========== VALIDAÇÃO ==========
+def gerar_id(nome):
+    texto = unicodedata.normalize("NFKD", nome).encode("ascii", "ignore").decode("ascii")
+    return "-".join(texto.lower().split())
+
+def validar_hora(hora):
+    # Caminho rápido para o formato já normalizado; strptime só para "8:00" e afins.
+    if isinstance(hora, str) and HORA_REGEX.fullmatch(hora):
+        return hora
+    try:
+        return datetime.strptime(hora.strip(), "%H:%M").strftime("%H:%M")
+    except (ValueError, AttributeError):
+        raise ErroValidacao(f"horário inválido: {hora!r} (use HH:MM)")
+
+def normalizar_horarios(horarios):
+    """Aceita a lista do remedios.json ou o texto do CSV ("08:00=Manhã;15:30=Tarde")."""
+    if isinstance(horarios, str):
+        itens = []
+        for parte in horarios.split(";"):
+            if not parte.strip():
+                continue
+            hora, _, periodo = parte.partition("=")
+            itens.append({"hora": hora, "periodo": periodo.strip()} if periodo.strip() else {"hora": hora})
+        horarios = itens
+
+    if not isinstance(horarios, list) or not horarios:
+        raise ErroValidacao("horarios vazio")
+
+    normalizados = []
+    for h in horarios:
+        if isinstance(h, str):
+            h = {"hora": h}
+        if not isinstance(h, dict) or "hora" not in h:
+            raise ErroValidacao(f"horário inválido: {h!r}")
+        item = {"hora": validar_hora(h["hora"])}
+        if h.get("periodo"):
+            item["periodo"] = str(h["periodo"]).strip()
+        normalizados.append(item)
+    return normalizados
+
+def validar_remedio(linha):
+    """Valida uma linha importada e devolve o remédio no formato do remedios.json."""
+    if not isinstance(linha, dict):
+        raise ErroValidacao("linha não é um objeto")
+
+    nome = str(linha.get("nome") or "").strip()
+    if not nome:
+        raise ErroValidacao("nome obrigatório")
+    dosagem = str(linha.get("dosagem") or "").strip()
+    if not dosagem:
+        raise ErroValidacao("dosagem obrigatória")
+
+    frequencia = str(linha.get("frequencia") or "").strip().lower()
+    if frequencia not in FREQUENCIAS_VALIDAS:
+        raise ErroValidacao(f"frequencia inválida: {frequencia!r} (use {' ou '.join(FREQUENCIAS_VALIDAS)})")
+
+    data_inicio = str(linha.get("data_inicio") or "").strip()
+    try:
+        if len(data_inicio) != 10:
+            raise ValueError
+        date.fromisoformat(data_inicio)
+    except ValueError:
+        raise ErroValidacao(f"data_inicio inválida: {data_inicio!r} (use AAAA-MM-DD)")
+
+    try:
+        duracao = float(linha.get("duracao_meses"))
+    except (TypeError, ValueError):
+        raise ErroValidacao(f"duracao_meses inválida: {linha.get('duracao_meses')!r}")
+    if duracao <= 0:
+        raise ErroValidacao("duracao_meses deve ser maior que zero")
+
+    return {
+        "id": str(linha.get("id") or "").strip() or gerar_id(nome),
+        "nome": nome,
+        "principio_ativo": str(linha.get("principio_ativo") or "").strip(),
+        "dosagem": dosagem,
+        "horarios": normalizar_horarios(linha.get("horarios")),
+        "frequencia": frequencia,
+        "data_inicio": data_inicio,
+        "duracao_meses": int(duracao) if duracao.is_integer() else duracao,
+        "obs": str(linha.get("obs") or "").strip(),
+    }
+
+
+# ========== LEITURA EM STREAMING ==========
+def sem_bom(arquivo):
+    """Tira o BOM que planilhas costumam pôr no início, mesmo se o texto já veio decodificado."""
+    linhas = iter(arquivo)
+    primeira = next(linhas, None)
+    if primeira is None:
+        return
+    yield primeira.removeprefix("\ufeff")
+    yield from linhas
+
+def ler_linhas_csv(arquivo):
+    leitor = csv.DictReader(sem_bom(arquivo))
+    while True:
+        try:
+            linha = next(leitor)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            raise ErroValidacao(f"CSV inválido na linha {leitor.reader.line_num}: {e}")
+        yield leitor.reader.line_num, linha
+
+def ler_linhas_jsonl(arquivo):
+    for numero, texto in enumerate(sem_bom(arquivo), start=1):
+        if not texto.strip():
+            continue
+        try:
+            yield numero, json.loads(texto)
+        except json.JSONDecodeError as e:
+            yield numero, ErroValidacao(f"JSON inválido: {e.msg}")
+
+LEITORES = {"csv": ler_linhas_csv, "jsonl": ler_linhas_jsonl}
+
+
+class LeitorJson:
+    """Lê um arquivo JSON em blocos, decodificando um valor por vez."""
+
+    def __init__(self, arquivo):
+        self.arquivo = arquivo
+        self.nome = getattr(arquivo, "name", "JSON")
+        self.buffer = ""
+        self.pos = 0
+        self.fim = False
+
+    def _ler_bloco(self):
+        bloco = self.arquivo.read(TAMANHO_BLOCO)
+        if not bloco:
+            self.fim = True
+        self.buffer = self.buffer[self.pos:] + bloco
+        self.pos = 0
+
+    def proximo_char(self):
+        while True:
+            self.pos = ESPACOS_REGEX.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if self.fim:
+                return ""
+            self._ler_bloco()
+
+    def consumir(self, esperado):
+        char = self.proximo_char()
+        if char != esperado:
+            raise ErroValidacao(f"{self.nome} inválido: esperava {esperado!r}, achou {char!r}")
+        self.pos += 1
+
+    def valor(self):
+        if self.proximo_char() in "-0123456789":
+            # "6.5" pode ser o começo de "6.5e10": lê até achar o fim do número.
+            while not self.fim and NUMERO_REGEX.match(self.buffer, self.pos).end() == len(self.buffer):
+                self._ler_bloco()
+        while True:
+            try:
+                valor, fim = DECODER.raw_decode(self.buffer, self.pos)
+                if fim < len(self.buffer) or self.fim:
+                    self.pos = fim
+                    return valor
+            except json.JSONDecodeError as e:
+                if self.fim:
+                    raise ErroValidacao(f"{self.nome} inválido: {e.msg}")
+            self._ler_bloco()
+
+    def pular(self):
+        """Descarta o próximo valor sem montá-lo inteiro em memória (um item por vez)."""
+        char = self.proximo_char()
+        if char == "[":
+            for _ in self.itens_array():
+                pass
+        elif char == "{":
+            self.pos += 1
+            if self.proximo_char() == "}":
+                self.pos += 1
+                return
+            while True:
+                self.valor()
+                self.consumir(":")
+                self.pular()
+                if self.proximo_char() == ",":
+                    self.pos += 1
+                    continue
+                self.consumir("}")
+                return
+        else:
+            self.valor()
+
+    def itens_array(self):
+        self.consumir("[")
+        if self.proximo_char() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.valor()
+            if self.proximo_char() == ",":
+                self.pos += 1
+                continue
+            self.consumir("]")
+            return
+
+def iterar_remedios(caminho=REMEDIOS_ARQUIVO):
+    if not os.path.exists(caminho):
+        return
+    with open(caminho, "r", encoding="utf-8") as f:
+        leitor = LeitorJson(f)
+        if leitor.proximo_char():
+            for remedio in leitor.itens_array():
+                if not isinstance(remedio, dict):
+                    raise ErroValidacao(f"{caminho} inválido: item {remedio!r} não é um objeto")
+                yield remedio
+
+def iterar_historico(caminho=HISTORICO_ARQUIVO, secoes=("confirmacoes", "pendencias")):
+    """Gera (secao, registro) sem carregar o historico.json inteiro."""
+    if not os.path.exists(caminho):
+        return
+    with open(caminho, "r", encoding="utf-8") as f:
+        leitor = LeitorJson(f)
+        if not leitor.proximo_char():
+            return
+        leitor.consumir("{")
+        if leitor.proximo_char() == "}":
+            return
+        while True:
+            chave = leitor.valor()
+            leitor.consumir(":")
+            if chave in secoes and leitor.proximo_char() == "[":
+                for registro in leitor.itens_array():
+                    yield chave, registro
+            else:
+                leitor.pular()
+            if leitor.proximo_char() == ",":
+                leitor.pos += 1
+                continue
+            leitor.consumir("}")
+            return
+
+
+# ========== IMPORTAÇÃO ==========
+def importar_remedios(arquivo, formato="csv", caminho=REMEDIOS_ARQUIVO, substituir=False):
+    """Importa remédios de CSV/JSONL linha a linha para o catálogo.
+
+    Cada linha válida faz upsert pelo id: um remédio já existente é substituído
+    pelo importado. Os importados vão primeiro para um arquivo auxiliar (só os
+    ids ficam em memória); depois o catálogo novo é escrito num temporário que
+    troca o remedios.json no final, então um import com erro nunca deixa o
+    catálogo pela metade. Sem nenhuma linha válida o catálogo não é tocado
+    (com substituir=True isso é um erro). Linhas inválidas são puladas e
+    contadas; só as primeiras ficam no relatório.
+    """
+    if formato not in LEITORES:
+        raise ErroValidacao(f"formato desconhecido: {formato!r} (use csv ou jsonl)")
+
+    resultado = {"importados": 0, "atualizados": 0, "mantidos": 0, "rejeitados": 0, "erros": []}
+    inicio = time.perf_counter()
+    ids_importados = set()
+
+    def rejeitar(numero, erro):
+        resultado["rejeitados"] += 1
+        if len(resultado["erros"]) < LIMITE_ERROS_GUARDADOS:
+            resultado["erros"].append({"linha": numero, "erro": erro})
+
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as importados:
+        for numero, linha in LEITORES[formato](arquivo):
+            try:
+                if isinstance(linha, Exception):
+                    raise linha
+                remedio = validar_remedio(linha)
+            except ErroValidacao as e:
+                rejeitar(numero, str(e))
+                continue
+            if remedio["id"] in ids_importados:
+                rejeitar(numero, f"id repetido no arquivo: {remedio['id']!r}")
+                continue
+            ids_importados.add(remedio["id"])
+            importados.write(json.dumps(remedio, ensure_ascii=False) + "\n")
+            resultado["importados"] += 1
+
+        if not resultado["importados"]:
+            resultado["segundos"] = round(time.perf_counter() - inicio, 3)
+            if substituir:
+                raise ErroValidacao("nenhum remédio válido no arquivo; catálogo mantido", resultado)
+            return resultado
+
+        # O upload é lido fora do lock; só a reescrita do catálogo é serializada.
+        with _lock_catalogo:
+            saida = tempfile.NamedTemporaryFile("w", encoding="utf-8", delete=False, suffix=".tmp",
+                                                dir=os.path.dirname(os.path.abspath(caminho)))
+            try:
+                with saida:
+                    saida.write("[")
+                    separador = "\n  "
+
+                    if not substituir:
+                        for remedio in iterar_remedios(caminho):
+                            if remedio.get("id") in ids_importados:
+                                resultado["atualizados"] += 1
+                                continue
+                            saida.write(separador + json.dumps(remedio, ensure_ascii=False))
+                            separador = ",\n  "
+                            resultado["mantidos"] += 1
+
+                    importados.seek(0)
+                    for texto in importados:
+                        saida.write(separador + texto.rstrip("\n"))
+                        separador = ",\n  "
+
+                    saida.write("\n]\n")
+                # NamedTemporaryFile nasce com 0600; mantém as permissões do catálogo.
+                os.chmod(saida.name, os.stat(caminho).st_mode if os.path.exists(caminho) else 0o644)
+                os.replace(saida.name, caminho)
+            finally:
+                if os.path.exists(saida.name):
+                    os.remove(saida.name)
+
+    resultado["segundos"] = round(time.perf_counter() - inicio, 3)
+    return resultado
+
+
+# ========== EXPORTAÇÃO ==========
+def exportar_historico(caminho=HISTORICO_ARQUIVO, secoes=("confirmacoes", "pendencias"), marcar_fim=False):
+    """Gera o histórico como linhas JSON (NDJSON), um registro por linha.
+
+    Com marcar_fim=True a última linha é {"tipo": "fim", "registros": N}. Um
+    erro antes da primeira linha é levantado (dá para responder 400); depois
+    que a saída começou, vira uma linha {"tipo": "erro"} e a exportação para
+    sem o "fim", então quem consome sabe que ela veio incompleta.
+    """
+    tipos = {"confirmacoes": "confirmacao", "pendencias": "pendencia"}
+    total = 0
+    registros = iterar_historico(caminho, secoes)
+    while True:
+        try:
+            secao, registro = next(registros)
+        except StopIteration:
+            break
+        except ErroValidacao as e:
+            if not marcar_fim or not total:
+                raise
+            yield json.dumps({"tipo": "erro", "erro": str(e), "registros": total}, ensure_ascii=False) + "\n"
+            return
+        total += 1
+        yield json.dumps({"tipo": tipos.get(secao, secao), **registro}, ensure_ascii=False) + "\n"
+    if marcar_fim:
+        yield json.dumps({"tipo": "fim", "registros": total}) + "\n"
+
+
+# ========== BENCHMARK ==========
+def gerar_linhas_csv(total):
+    yield ",".join(CAMPOS_CSV) + "\n"
+    for i in range(total):
+        frequencia = "semanal" if i % 7 == 0 else "diario"
+        yield (f"med-{i},Remedio {i},Principio {i % 97},{i % 500 + 1}mg,"
+               f"08:00=Manhã;20:00=Noite,{frequencia},2025-03-21,{i % 12 + 1},\n")
+
+def benchmark(total=1_000_000, caminho="benchmark_remedios.json"):
+    origem = f"{caminho}.csv"
+    with open(origem, "w", encoding="utf-8", newline="") as f:
+        f.writelines(gerar_linhas_csv(total))
+    try:
+        with open(origem, "r", encoding="utf-8", newline="") as f:
+            resultado = importar_remedios(f, "csv", caminho=caminho, substituir=True)
+    finally:
+        os.remove(origem)
+        if os.path.exists(caminho):
+            os.remove(caminho)
+    resultado["linhas_por_segundo"] = round(resultado["importados"] / resultado["segundos"])
+    return resultado
+
+
+# ========== EXECUÇÃO ==========
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Importação e exportação em massa.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_importar = sub.add_parser("importar", help="importa CSV/JSONL para o remedios.json")
+    p_importar.add_argument("arquivo")
+    p_importar.add_argument("--formato", choices=sorted(LEITORES))
+    p_importar.add_argument("--substituir", action="store_true", help="descarta o catálogo atual")
+
+    p_exportar = sub.add_parser("exportar", help="exporta o historico.json como NDJSON")
+    p_exportar.add_argument("saida", nargs="?", default="-")
+    p_exportar.add_argument("--secao", choices=["confirmacoes", "pendencias"])
+
+    p_bench = sub.add_parser("benchmark", help="mede a importação de N linhas sintéticas")
+    p_bench.add_argument("--linhas", type=int, default=1_000_000)
+
+    args = parser.parse_args()
+
+    if args.comando == "importar":
+        formato = args.formato or ("jsonl" if args.arquivo.endswith((".jsonl", ".ndjson")) else "csv")
+        with open(args.arquivo, "r", encoding="utf-8-sig", newline="") as f:
+            print(json.dumps(importar_remedios(f, formato, substituir=args.substituir), ensure_ascii=False, indent=2))
+    elif args.comando == "exportar":
+        secoes = (args.secao,) if args.secao else ("confirmacoes", "pendencias")
+        if args.saida == "-":
+            sys.stdout.writelines(exportar_historico(secoes=secoes))
+        else:
+            with open(args.saida, "w", encoding="utf-8") as saida:
+                saida.writelines(exportar_historico(secoes=secoes))
+    else:
+        print(json.dumps(benchmark(args.linhas), indent=2))
@@ -8,6 +8,7 @@ from apscheduler.triggers.cron import CronTrigger
 from twilio.rest import Client
 from dotenv import load_dotenv
 from pytz import timezone
+import eventos
 
 # ========== CONFIGURAÇÃO ==========
 def agora_br():
@@ -30,9 +31,6 @@ COMANDOS_ARQUIVO = "ultimos_comandos.json"
 scheduler = BackgroundScheduler()
 
 # ========== UTILITÁRIOS ==========
-def log(msg):
-    print(f"[{agora_br().strftime('%Y-%m-%d %H:%M:%S')}] {msg}")
-
 def carregar_json(caminho, tipo_lista=False):
     if not os.path.exists(caminho):
         return [] if tipo_lista else {}
@@ -66,9 +64,9 @@ def registrar_ultimo_comando(remedio, hora):
 def enviar_mensagem(mensagem):
     try:
         client.messages.create(body=mensagem, from_=TWILIO_NUMBER, to=DESTINO)
-        log(f"[📤] Mensagem enviada: {mensagem}")
+        eventos.info("mensagem_enviada", mensagem)
     except Exception as e:
-        log(f"[❌] Erro ao enviar mensagem: {e}")
+        eventos.erro("erro_envio", str(e), texto=mensagem)
 
 # ========== AGENDAMENTOS ==========
 def agendar_alertas():
@@ -173,7 +171,7 @@ def agendar_reenvio_pendentes():
                     enviar_mensagem(mensagem)
                     reenviadas += 1
             except Exception as e:
-                log(f"[⚠️] Erro na pendência: {e}")
+                eventos.aviso("erro_pendencia", str(e), pendencia=dict(p))
 
         if reenviadas:
             salvar_json(HISTORICO_ARQUIVO, historico)
@@ -182,8 +180,8 @@ def agendar_reenvio_pendentes():
 
 # ========== EXECUÇÃO ==========
 if __name__ == "__main__":
-    log("🚀 main.py está rodando normalmente no Render!")
-    log("🦥 Agendador iniciado...")
+    eventos.info("processo_iniciado", "🚀 main.py está rodando normalmente no Render!")
+    eventos.info("agendador_iniciado", "🦥 Agendador iniciado...")
     scheduler.start()
     agendar_alertas()
     agendar_relatorio_diario()
@@ -195,4 +193,4 @@ if __name__ == "__main__":
             time.sleep(1)
     except (KeyboardInterrupt, SystemExit):
         scheduler.shutdown()
-        log("🚩 Agendador encerrado.")
\ No newline at end of file
+        eventos.info("agendador_encerrado", "🚩 Agendador encerrado.")
\ No newline at end of file
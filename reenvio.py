@@ -5,6 +5,7 @@ import os
 from twilio.rest import Client
 from dotenv import load_dotenv
 from pathlib import Path
+import eventos
 
 # ========== CARREGAR VARIÁVEIS DO AMBIENTE ==========
 env_path = Path(__file__).parent / ".env"
@@ -16,10 +17,12 @@ TWILIO_NUMERO = os.getenv("TWILIO_NUMBER")
 SEU_NUMERO = os.getenv("DESTINO")
 
 # ========== DEBUG ==========
-print("🔍 TWILIO_SID:", TWILIO_SID)
-print("🔍 TWILIO_TOKEN:", TWILIO_TOKEN)
-print("🔍 TWILIO_NUMERO:", TWILIO_NUMERO)
-print("🔍 SEU_NUMERO:", SEU_NUMERO)
+eventos.info("ambiente_carregado", variaveis={
+    "TWILIO_ACCOUNT_SID": bool(TWILIO_SID),
+    "TWILIO_AUTH_TOKEN": bool(TWILIO_TOKEN),
+    "TWILIO_NUMBER": bool(TWILIO_NUMERO),
+    "DESTINO": bool(SEU_NUMERO),
+})
 
 if not all([TWILIO_SID, TWILIO_TOKEN, TWILIO_NUMERO, SEU_NUMERO]):
     raise EnvironmentError("⚠️ Variáveis do Twilio não estão configuradas corretamente no .env")
@@ -31,11 +34,11 @@ HISTORICO_ARQUIVO = "historico.json"
 LIMITE_TENTATIVAS = 3
 INTERVALO_REENVIO = 600  # 10 minutos
 
-# ========== FUNÇÕES ==========
-def log(msg):
-    agora = datetime.datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
-    print(f"{agora} {msg}")
+# Cada passada repete o estado de todas as pendências; limita o que é só informativo.
+eventos.configurar("pendencia_aguardando", limite=20, janela=INTERVALO_REENVIO)
+eventos.configurar("pendencia_confirmada", limite=20, janela=INTERVALO_REENVIO)
 
+# ========== FUNÇÕES ==========
 def carregar_historico():
     if not os.path.exists(HISTORICO_ARQUIVO):
         return {"confirmacoes": [], "pendencias": []}
@@ -47,7 +50,7 @@ def carregar_historico():
                 "pendencias": data.get("pendencias", [])
             }
     except Exception as e:
-        log(f"[❌ ERRO] Falha ao carregar histórico: {e}")
+        eventos.erro("erro_leitura", f"Falha ao carregar histórico: {e}", arquivo=HISTORICO_ARQUIVO)
         return {"confirmacoes": [], "pendencias": []}
 
 def salvar_historico(historico):
@@ -55,14 +58,14 @@ def salvar_historico(historico):
         with open(HISTORICO_ARQUIVO, "w", encoding="utf-8") as f:
             json.dump(historico, f, indent=2, ensure_ascii=False)
     except Exception as e:
-        log(f"[❌ ERRO] Falha ao salvar histórico: {e}")
+        eventos.erro("erro_escrita", f"Falha ao salvar histórico: {e}", arquivo=HISTORICO_ARQUIVO)
 
 def enviar_mensagem(texto):
     try:
         client.messages.create(from_=TWILIO_NUMERO, to=SEU_NUMERO, body=texto)
-        log(f"[📤 REENVIO] {texto}")
+        eventos.info("mensagem_enviada", texto)
     except Exception as e:
-        log(f"[❌ ERRO WHATSAPP] {e}")
+        eventos.erro("erro_envio", str(e), texto=texto)
 
 def verificar_pendencias():
     historico = carregar_historico()
@@ -75,7 +78,7 @@ def verificar_pendencias():
         if p.get("data") == hoje
     ]
 
-    log(f"[🔎] Total de pendências para hoje: {len(pendencias_ativas)}")
+    eventos.info("verificacao_pendencias", total=len(pendencias_ativas))
 
     for pendencia in pendencias_ativas:
         nome = pendencia.get("remedio")
@@ -84,7 +87,7 @@ def verificar_pendencias():
 
         hora_completa = datetime.datetime.strptime(f"{hoje} {horario}", "%Y-%m-%d %H:%M")
         if hora_completa > agora:
-            log(f"[⏳ AGUARDANDO] {nome} às {horario}")
+            eventos.info("pendencia_aguardando", remedio=nome, horario=horario)
             novas_pendencias.append(pendencia)
             continue
 
@@ -93,7 +96,7 @@ def verificar_pendencias():
             for c in historico.get("confirmacoes", [])
         )
         if confirmado:
-            log(f"[✅ CONFIRMADO] {nome} às {horario}")
+            eventos.info("pendencia_confirmada", remedio=nome, horario=horario)
             continue
 
         if tentativas < LIMITE_TENTATIVAS:
@@ -104,17 +107,18 @@ def verificar_pendencias():
             )
             enviar_mensagem(mensagem)
             novas_pendencias.append(pendencia)
-            log(f"[🔁 NOVA TENTATIVA {pendencia['tentativas']}/{LIMITE_TENTATIVAS}] {nome} às {horario}")
+            eventos.info("pendencia_reenviada", remedio=nome, horario=horario,
+                         tentativa=pendencia["tentativas"], limite=LIMITE_TENTATIVAS)
         else:
-            log(f"[⚠️ LIMITE ATINGIDO] {nome} às {horario} ({tentativas} tentativas)")
+            eventos.aviso("limite_tentativas", remedio=nome, horario=horario, tentativas=tentativas)
 
     historico["pendencias"] = novas_pendencias
     salvar_historico(historico)
 
 # ========== EXECUÇÃO ==========
 if __name__ == "__main__":
-    log("🚀 reenvio.py está rodando normalmente no Render!")
-    log("🔁 Monitor de reenvios iniciado.")
+    eventos.info("processo_iniciado", "🚀 reenvio.py está rodando normalmente no Render!")
+    eventos.info("monitor_iniciado", "🔁 Monitor de reenvios iniciado.")
     while True:
         verificar_pendencias()
         time.sleep(INTERVALO_REENVIO)
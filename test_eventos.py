@@ -0,0 +1,159 @@
+import json
+import queue
+import threading
+from collections import deque
+from types import SimpleNamespace
+
+import pytest
+
+import eventos
+
+
+@pytest.fixture(autouse=True)
+def eventos_isolados(monkeypatch, tmp_path):
+    monkeypatch.setattr(eventos, "_buffer", deque(maxlen=eventos.TAMANHO_BUFFER))
+    monkeypatch.setattr(eventos, "_fila", queue.Queue(maxsize=eventos.TAMANHO_FILA))
+    monkeypatch.setattr(eventos, "_regras", {})
+    monkeypatch.setattr(eventos, "_contadores", {})
+    monkeypatch.setattr(eventos, "_escritor", None)
+    monkeypatch.setattr(eventos, "_descartados", 0)
+    monkeypatch.setattr(eventos, "NIVEL_MINIMO", eventos.NIVEIS["info"])
+    monkeypatch.setattr(eventos, "LOG_DIR", str(tmp_path))
+    monkeypatch.setattr(eventos, "ARQUIVO_PROCESSO", str(tmp_path / "eventos-webhook.ndjson"))
+    yield
+    eventos.encerrar()
+
+
+def escritos(capsys):
+    """Esvazia a fila do escritor e devolve o que ele mandou para o stdout."""
+    eventos.encerrar()
+    return [json.loads(linha) for linha in capsys.readouterr().out.splitlines()]
+
+
+def escrever_ndjson(caminho, linhas):
+    caminho.write_text("".join(l if isinstance(l, str) else json.dumps(l) + "\n" for l in linhas), encoding="utf-8")
+
+
+# ========== REGRAS ==========
+def test_amostragem_emite_um_a_cada_n_com_suprimidos():
+    eventos.configurar("nenhum_agendado", amostragem=60)
+    for i in range(125):
+        eventos.info("nenhum_agendado", hora=i)
+
+    emitidos = [(e["hora"], e.get("suprimidos")) for e in reversed(eventos.recentes(10))]
+    assert emitidos == [(0, None), (60, 59), (120, 59)]
+
+
+def test_limite_por_janela(monkeypatch):
+    relogio = SimpleNamespace(agora=1000.0)
+    monkeypatch.setattr(eventos, "time", SimpleNamespace(time=lambda: relogio.agora))
+    eventos.configurar("pendencia_aguardando", limite=2, janela=600)
+
+    for i in range(5):
+        eventos.info("pendencia_aguardando", n=i)
+    relogio.agora += 600
+    eventos.info("pendencia_aguardando", n=99)
+
+    emitidos = [(e["n"], e.get("suprimidos")) for e in reversed(eventos.recentes(10))]
+    assert emitidos == [(0, None), (1, None), (99, 3)]
+
+
+def test_nivel_minimo():
+    eventos.debug("detalhe")
+    eventos.aviso("importante")
+
+    assert [e["tipo"] for e in eventos.recentes(10)] == ["importante"]
+
+
+# ========== BUFFER E ESCRITOR ==========
+def test_buffer_circular_guarda_so_os_ultimos(monkeypatch):
+    monkeypatch.setattr(eventos, "_buffer", deque(maxlen=5))
+    for i in range(12):
+        eventos.info("x", i=i)
+
+    assert [e["i"] for e in eventos.recentes(100)] == [11, 10, 9, 8, 7]
+
+
+def test_escritor_grava_stdout_e_arquivo(capsys, tmp_path):
+    eventos.info("mensagem_enviada", "oi", destino="whatsapp")
+
+    linhas = escritos(capsys)
+
+    assert [(e["tipo"], e["mensagem"], e["destino"]) for e in linhas] == [("mensagem_enviada", "oi", "whatsapp")]
+    assert json.loads((tmp_path / "eventos-webhook.ndjson").read_text(encoding="utf-8")) == linhas[0]
+
+
+def test_fila_cheia_conta_descartados_sem_perder_nenhum(monkeypatch, capsys):
+    monkeypatch.setattr(eventos, "_fila", queue.Queue(maxsize=50))
+
+    def emitir_muitos():
+        for i in range(5000):
+            eventos.info("perf", i=i)
+
+    threads = [threading.Thread(target=emitir_muitos) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    linhas = escritos(capsys)
+
+    gravados = sum(1 for e in linhas if e["tipo"] == "perf")
+    descartados = sum(e["quantidade"] for e in linhas if e["tipo"] == "eventos_descartados")
+    assert descartados > 0
+    assert gravados + descartados == 4 * 5000
+
+
+def test_descartes_pendentes_sao_reportados_ao_encerrar(monkeypatch, capsys):
+    # Fila vazia e descartes ainda não reportados: o escritor só vai ver o _FIM.
+    monkeypatch.setattr(eventos, "_descartados", 7)
+    eventos._iniciar_escritor()
+
+    assert [(e["tipo"], e["quantidade"]) for e in escritos(capsys)] == [("eventos_descartados", 7)]
+
+
+def test_campos_que_nao_sao_json_viram_texto(capsys):
+    eventos.info("x", obj=object(), conjunto={1})
+
+    recentes = eventos.recentes(10)
+    json.dumps(recentes)
+    assert recentes[0]["obj"].startswith("<object object")
+    assert escritos(capsys)[0]["conjunto"] == "{1}"
+
+
+def test_rotacao_do_arquivo(monkeypatch, tmp_path):
+    monkeypatch.setattr(eventos, "LIMITE_ARQUIVO", 200)
+    linha = "x" * 149 + "\n"
+
+    eventos._gravar_arquivo(linha)
+    eventos._gravar_arquivo(linha)
+    eventos._gravar_arquivo(linha)
+
+    assert (tmp_path / "eventos-webhook.ndjson.1").read_text() == linha * 2
+    assert (tmp_path / "eventos-webhook.ndjson").read_text() == linha
+
+
+# ========== OUTROS PROCESSOS ==========
+def test_recentes_junta_outros_processos_em_ordem(tmp_path):
+    escrever_ndjson(tmp_path / "eventos-app.ndjson.1", [
+        {"ts": "2025-04-19T06:00:00.000-03:00", "nivel": "info", "tipo": "processo_iniciado", "processo": "app"},
+    ])
+    escrever_ndjson(tmp_path / "eventos-app.ndjson", [
+        {"ts": "2025-04-19T06:30:00.000-03:00", "nivel": "info", "tipo": "mensagem_enviada", "processo": "app"},
+        '{"ts": "2025-04-19T06:31:00.000-03:00", "nivel": "in',  # escrita pela metade
+    ])
+    escrever_ndjson(tmp_path / "eventos-reenvio.ndjson", [
+        {"ts": "2025-04-19T06:45:00.000-03:00", "nivel": "aviso", "tipo": "limite_tentativas", "processo": "reenvio"},
+        "não é json\n",
+    ])
+    # O arquivo do próprio processo é ignorado: esses eventos vêm do buffer.
+    escrever_ndjson(tmp_path / "eventos-webhook.ndjson", [
+        {"ts": "2025-04-19T07:00:00.000-03:00", "nivel": "erro", "tipo": "duplicado", "processo": "webhook"},
+    ])
+    eventos.info("webhook_evento")
+
+    assert [e["tipo"] for e in eventos.recentes(10)] == [
+        "webhook_evento", "limite_tentativas", "mensagem_enviada", "processo_iniciado",
+    ]
+    assert [e["tipo"] for e in eventos.recentes(2)] == ["webhook_evento", "limite_tentativas"]
+    assert [e["processo"] for e in eventos.recentes(10, nivel="aviso")] == ["reenvio"]
+    assert [e["processo"] for e in eventos.recentes(10, tipo="mensagem_enviada")] == ["app"]
@@ -0,0 +1,260 @@
+import csv
+import io
+import json
+import threading
+
+import pytest
+
+import importacao
+
+
+def escrever_json(caminho, conteudo):
+    caminho.write_text(json.dumps(conteudo, ensure_ascii=False, indent=2), encoding="utf-8")
+    return str(caminho)
+
+
+# ========== LEITOR JSON ==========
+@pytest.fixture
+def blocos_pequenos(monkeypatch):
+    monkeypatch.setattr(importacao, "TAMANHO_BLOCO", 3)
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ('[{"nome": "Lipídil", "horarios": [{"hora": "10:30"}]}, {"obs": "a\\"b"}]',
+     [{"nome": "Lipídil", "horarios": [{"hora": "10:30"}]}, {"obs": 'a"b'}]),
+    ("[12345, 6.5e10, -7]", [12345, 6.5e10, -7]),
+    ("  [ true ,null,false ]  ", [True, None, False]),
+    ("[]", []),
+    ("[ ]", []),
+    ("[{}, []]", [{}, []]),
+])
+def test_leitor_json_itens_array(blocos_pequenos, texto, esperado):
+    assert list(importacao.LeitorJson(io.StringIO(texto)).itens_array()) == esperado
+
+
+def test_leitor_json_numero_no_fim_do_arquivo(blocos_pequenos):
+    # "123456" atravessa dois blocos de 3 e termina exatamente no fim do arquivo.
+    assert importacao.LeitorJson(io.StringIO("123456")).valor() == 123456
+
+
+@pytest.mark.parametrize("conteudo", [
+    {},
+    {"confirmacoes": [], "pendencias": []},
+    {"extra": {"a": [1, {"b": []}], "c": {}}, "confirmacoes": [{"hora": "06:30"}], "fim": 10},
+])
+def test_iterar_historico_com_blocos_pequenos(blocos_pequenos, tmp_path, conteudo):
+    caminho = escrever_json(tmp_path / "historico.json", conteudo)
+    esperado = [(s, r) for s in ("confirmacoes", "pendencias") for r in conteudo.get(s, [])]
+    assert list(importacao.iterar_historico(caminho)) == esperado
+
+
+def test_iterar_historico_arquivo_vazio(tmp_path):
+    caminho = tmp_path / "historico.json"
+    caminho.write_text("", encoding="utf-8")
+    assert list(importacao.iterar_historico(str(caminho))) == []
+    assert list(importacao.iterar_historico(str(tmp_path / "nao_existe.json"))) == []
+
+
+# ========== VALIDAÇÃO ==========
+LINHA_VALIDA = {"nome": "Reforga Imuno", "dosagem": "1 comprimido", "horarios": "8:00=Manhã;15:30=Tarde",
+                "frequencia": "Diario", "data_inicio": "2025-03-21", "duracao_meses": "6"}
+
+
+def test_validar_remedio_normaliza_linha():
+    assert importacao.validar_remedio(LINHA_VALIDA) == {
+        "id": "reforga-imuno", "nome": "Reforga Imuno", "principio_ativo": "", "dosagem": "1 comprimido",
+        "horarios": [{"hora": "08:00", "periodo": "Manhã"}, {"hora": "15:30", "periodo": "Tarde"}],
+        "frequencia": "diario", "data_inicio": "2025-03-21", "duracao_meses": 6, "obs": "",
+    }
+
+
+@pytest.mark.parametrize("campo, valor, erro", [
+    ("nome", " ", "nome obrigatório"),
+    ("dosagem", None, "dosagem obrigatória"),
+    ("frequencia", "mensal", "frequencia inválida"),
+    ("horarios", "", "horarios vazio"),
+    ("horarios", "08:00;24:00", "horário inválido"),
+    ("horarios", [{"periodo": "Manhã"}], "horário inválido"),
+    ("data_inicio", "2025-02-30", "data_inicio inválida"),
+    ("data_inicio", "20250321", "data_inicio inválida"),
+    ("duracao_meses", "seis", "duracao_meses inválida"),
+    ("duracao_meses", 0, "maior que zero"),
+])
+def test_validar_remedio_rejeita(campo, valor, erro):
+    with pytest.raises(importacao.ErroValidacao, match=erro):
+        importacao.validar_remedio({**LINHA_VALIDA, campo: valor})
+
+
+def test_importar_jsonl_reporta_linhas_invalidas(tmp_path):
+    caminho = str(tmp_path / "remedios.json")
+    texto = json.dumps({**LINHA_VALIDA, "horarios": ["09:00"]}) + "\n\nnao e json\n[1]\n"
+
+    resultado = importacao.importar_remedios(io.StringIO(texto), "jsonl", caminho=caminho)
+
+    assert resultado["importados"] == 1
+    assert [e["linha"] for e in resultado["erros"]] == [3, 4]
+
+
+# ========== EXPORTAÇÃO ==========
+def test_exporta_so_a_segunda_secao(tmp_path, monkeypatch):
+    monkeypatch.setattr(importacao, "TAMANHO_BLOCO", 7)
+    historico = {
+        "confirmacoes": [{"remedio": f"R{i}", "data": "2025-04-19", "hora": "06:30", "confirmado": True}
+                         for i in range(200)],
+        "pendencias": [{"remedio": "Zyloric", "horario": "06:30", "data": "2025-04-19", "tentativas": 2}],
+    }
+    caminho = escrever_json(tmp_path / "historico.json", historico)
+
+    linhas = list(importacao.exportar_historico(caminho, ("pendencias",)))
+
+    assert [json.loads(l) for l in linhas] == [{"tipo": "pendencia", **historico["pendencias"][0]}]
+
+
+# ========== IMPORTAÇÃO ==========
+CATALOGO = [
+    {"id": "lipidil", "nome": "Lipidil", "principio_ativo": "Fenofibrato", "dosagem": "160mg",
+     "horarios": [{"hora": "10:30"}], "frequencia": "diario", "data_inicio": "2025-03-21",
+     "duracao_meses": 4, "obs": ""},
+    {"id": "zyloric", "nome": "Zyloric", "principio_ativo": "Alopurinol", "dosagem": "300mg",
+     "horarios": [{"hora": "06:30"}], "frequencia": "diario", "data_inicio": "2025-03-21",
+     "duracao_meses": 3, "obs": ""},
+]
+CABECALHO = "nome,dosagem,horarios,frequencia,data_inicio,duracao_meses\n"
+
+
+def importar_csv(caminho, texto, **kwargs):
+    return importacao.importar_remedios(io.StringIO(texto, newline=""), "csv", caminho=caminho, **kwargs)
+
+
+def test_importar_faz_upsert_pelo_id(tmp_path):
+    caminho = escrever_json(tmp_path / "remedios.json", CATALOGO)
+    texto = CABECALHO + "Lipidil,200mg,08:00,diario,2025-05-01,2\nDipirona,500mg,08:00=Manhã;20:00,diario,2025-05-01,1\n"
+
+    primeiro = importar_csv(caminho, texto)
+    segundo = importar_csv(caminho, texto)
+
+    catalogo = json.loads(open(caminho, encoding="utf-8").read())
+    assert [r["id"] for r in catalogo] == ["zyloric", "lipidil", "dipirona"]
+    assert catalogo[1]["dosagem"] == "200mg"
+    assert catalogo[2]["horarios"] == [{"hora": "08:00", "periodo": "Manhã"}, {"hora": "20:00"}]
+    assert (primeiro["importados"], primeiro["atualizados"], primeiro["mantidos"]) == (2, 1, 1)
+    assert (segundo["importados"], segundo["atualizados"], segundo["mantidos"]) == (2, 2, 1)
+
+
+def test_importar_rejeita_id_repetido_no_arquivo(tmp_path):
+    caminho = str(tmp_path / "remedios.json")
+    resultado = importar_csv(caminho, CABECALHO + "Dipirona,500mg,08:00,diario,2025-05-01,1\n"
+                                                  "Dipirona,1g,09:00,diario,2025-05-01,1\n")
+
+    assert resultado["importados"] == 1
+    assert resultado["erros"] == [{"linha": 3, "erro": "id repetido no arquivo: 'dipirona'"}]
+
+
+def test_substituir_sem_linhas_validas_mantem_catalogo(tmp_path):
+    caminho = escrever_json(tmp_path / "remedios.json", CATALOGO)
+
+    for texto in ("", CABECALHO + "X,1,25:00,diario,2025-05-01,1\n"):
+        with pytest.raises(importacao.ErroValidacao) as erro:
+            importar_csv(caminho, texto, substituir=True)
+        assert erro.value.resultado["importados"] == 0
+
+    assert json.loads(open(caminho, encoding="utf-8").read()) == CATALOGO
+
+
+def test_substituir_descarta_catalogo_atual(tmp_path):
+    caminho = escrever_json(tmp_path / "remedios.json", CATALOGO)
+
+    resultado = importar_csv(caminho, CABECALHO + "Dipirona,500mg,08:00,diario,2025-05-01,1\n", substituir=True)
+
+    assert resultado["mantidos"] == 0
+    assert [r["id"] for r in json.loads(open(caminho, encoding="utf-8").read())] == ["dipirona"]
+
+
+def test_imports_concorrentes_nao_perdem_linhas(tmp_path):
+    caminho = escrever_json(tmp_path / "remedios.json", CATALOGO)
+    textos = [CABECALHO + "".join(f"R{t}-{i},1mg,08:00,diario,2025-05-01,1\n" for i in range(300))
+              for t in range(4)]
+
+    threads = [threading.Thread(target=importar_csv, args=(caminho, texto)) for texto in textos]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(json.loads(open(caminho, encoding="utf-8").read())) == len(CATALOGO) + 4 * 300
+    assert [p.name for p in tmp_path.iterdir()] == ["remedios.json"]
+
+
+@pytest.mark.parametrize("catalogo", ['[{"id": "lipidil", ', '{"id": 1}', '[1 2]'])
+def test_catalogo_corrompido_vira_erro_de_validacao(tmp_path, catalogo):
+    caminho = tmp_path / "remedios.json"
+    caminho.write_text(catalogo, encoding="utf-8")
+
+    with pytest.raises(importacao.ErroValidacao):
+        importar_csv(str(caminho), CABECALHO + "Dipirona,500mg,08:00,diario,2025-05-01,1\n")
+
+    assert caminho.read_text(encoding="utf-8") == catalogo
+    assert [p.name for p in tmp_path.iterdir()] == ["remedios.json"]
+
+
+def test_csv_malformado_vira_erro_de_validacao(tmp_path):
+    caminho = escrever_json(tmp_path / "remedios.json", CATALOGO)
+    limite = csv.field_size_limit(20)
+    try:
+        with pytest.raises(importacao.ErroValidacao, match="CSV inválido na linha 2"):
+            importar_csv(caminho, CABECALHO + "Dipirona,500mg com um nome comprido,08:00,diario,2025-05-01,1\n")
+    finally:
+        csv.field_size_limit(limite)
+
+
+@pytest.mark.parametrize("decodificar", [
+    lambda dados: io.TextIOWrapper(io.BytesIO(dados), encoding="utf-8-sig", newline=""),
+    lambda dados: io.StringIO(dados.decode("utf-8"), newline=""),  # BOM já decodificado como "\ufeff"
+])
+def test_importar_csv_com_bom(tmp_path, decodificar):
+    caminho = escrever_json(tmp_path / "remedios.json", CATALOGO)
+    dados = ("\ufeffid," + CABECALHO + "zyloric,Zyloric,100mg,06:30,diario,2025-05-01,1\n").encode("utf-8")
+
+    resultado = importacao.importar_remedios(decodificar(dados), "csv", caminho=caminho)
+
+    assert (resultado["importados"], resultado["atualizados"], resultado["rejeitados"]) == (1, 1, 0)
+    catalogo = json.loads(open(caminho, encoding="utf-8").read())
+    assert [(r["id"], r["dosagem"]) for r in catalogo] == [("lipidil", "160mg"), ("zyloric", "100mg")]
+
+
+def test_importar_jsonl_com_bom(tmp_path):
+    caminho = str(tmp_path / "remedios.json")
+    texto = "\ufeff" + json.dumps({**LINHA_VALIDA, "id": "reforga"}) + "\n"
+
+    resultado = importacao.importar_remedios(io.StringIO(texto), "jsonl", caminho=caminho)
+
+    assert (resultado["importados"], resultado["rejeitados"]) == (1, 0)
+
+
+def test_exportar_com_marcador_de_fim(tmp_path):
+    caminho = escrever_json(tmp_path / "historico.json", {"confirmacoes": [{"hora": "06:30"}], "pendencias": []})
+
+    linhas = [json.loads(l) for l in importacao.exportar_historico(caminho, marcar_fim=True)]
+
+    assert linhas == [{"tipo": "confirmacao", "hora": "06:30"}, {"tipo": "fim", "registros": 1}]
+    assert [json.loads(l) for l in importacao.exportar_historico(str(tmp_path / "nao_existe.json"), marcar_fim=True)] \
+        == [{"tipo": "fim", "registros": 0}]
+
+
+@pytest.mark.parametrize("texto", ['{"confirmacoes": [', '["confirmacoes"]', '{"confirmacoes": [}'])
+def test_exportar_historico_corrompido_no_inicio_levanta(tmp_path, texto):
+    caminho = tmp_path / "historico.json"
+    caminho.write_text(texto, encoding="utf-8")
+
+    with pytest.raises(importacao.ErroValidacao):
+        next(importacao.exportar_historico(str(caminho), marcar_fim=True))
+
+
+def test_exportar_historico_cortado_no_meio_termina_com_erro(tmp_path):
+    caminho = tmp_path / "historico.json"
+    caminho.write_text('{"confirmacoes": [{"hora": "06:30"}, {"hora": "08:', encoding="utf-8")
+
+    linhas = [json.loads(l) for l in importacao.exportar_historico(str(caminho), marcar_fim=True)]
+
+    assert linhas[0] == {"tipo": "confirmacao", "hora": "06:30"}
+    assert linhas[-1]["tipo"] == "erro" and linhas[-1]["registros"] == 1
@@ -6,8 +6,13 @@ import re
 import difflib
 import pytz
 import random
-from flask import Flask, request
+import itertools
+import io
+import hmac
+from flask import Flask, Response, request, jsonify
 from twilio.twiml.messaging_response import MessagingResponse
+import importacao
+import eventos
 
 # ========== TIMEZONE ==========
 os.environ["TZ"] = "America/Sao_Paulo"
@@ -21,6 +26,9 @@ HISTORICO_ARQUIVO = "historico.json"
 REMEDIOS_ARQUIVO = "remedios.json"
 CONTEXTO_ARQUIVO = "contexto.json"
 
+# ========== ADMIN ==========
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
 # ========== FUNÇÕES UTILITÁRIAS ==========
 def agora_br():
     return datetime.datetime.now(pytz.timezone("America/Sao_Paulo"))
@@ -86,6 +94,65 @@ def listar_remedios_do_dia(remedios):
 def ping():
     return "pong", 200
 
+# ========== ROTAS DE ADMINISTRAÇÃO ==========
+def admin_autorizado():
+    if not ADMIN_TOKEN:
+        return False
+    token = request.headers.get("X-Admin-Token") or request.headers.get("Authorization", "").removeprefix("Bearer ")
+    return hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+@app.route("/admin/importar", methods=["POST"])
+def admin_importar():
+    """Recebe CSV/JSONL (inclusive com Transfer-Encoding: chunked) e lê o corpo em streaming."""
+    if not admin_autorizado():
+        return jsonify({"erro": "não autorizado"}), 403
+
+    formato = request.args.get("formato") or ("jsonl" if "json" in (request.mimetype or "") else "csv")
+    substituir = request.args.get("substituir") in ("1", "true", "sim")
+    corpo = io.TextIOWrapper(request.stream, encoding="utf-8-sig", newline="")
+    try:
+        resultado = importacao.importar_remedios(corpo, formato, caminho=REMEDIOS_ARQUIVO, substituir=substituir)
+    except (importacao.ErroValidacao, UnicodeDecodeError) as e:
+        return jsonify({"erro": str(e), **(getattr(e, "resultado", None) or {})}), 400
+    eventos.info("importacao_concluida", formato=formato, substituir=substituir,
+                 **{k: v for k, v in resultado.items() if k != "erros"})
+    return jsonify(resultado), 200
+
+@app.route("/admin/exportar", methods=["GET"])
+def admin_exportar():
+    if not admin_autorizado():
+        return jsonify({"erro": "não autorizado"}), 403
+
+    secao = request.args.get("secao")
+    if secao and secao not in ("confirmacoes", "pendencias"):
+        return jsonify({"erro": f"seção inválida: {secao}"}), 400
+    secoes = (secao,) if secao else ("confirmacoes", "pendencias")
+    linhas = importacao.exportar_historico(HISTORICO_ARQUIVO, secoes, marcar_fim=True)
+    # Lê a primeira linha antes de responder: arquivo corrompido logo no início vira 400, não um 200 truncado.
+    try:
+        primeira = next(linhas)
+    except importacao.ErroValidacao as e:
+        return jsonify({"erro": str(e)}), 400
+    return Response(itertools.chain([primeira], linhas), mimetype="application/x-ndjson")
+
+@app.route("/debug/events", methods=["GET"])
+def debug_eventos():
+    """Últimos eventos de todos os processos: buffer em memória do webhook + NDJSON dos demais."""
+    if not admin_autorizado():
+        return jsonify({"erro": "não autorizado"}), 403
+
+    try:
+        limite = max(1, min(int(request.args.get("limite", 100)), eventos.TAMANHO_BUFFER))
+    except ValueError:
+        return jsonify({"erro": "limite inválido"}), 400
+    nivel = request.args.get("nivel")
+    if nivel and nivel not in eventos.NIVEIS:
+        return jsonify({"erro": f"nível inválido: {nivel}"}), 400
+    return jsonify({
+        "eventos": eventos.recentes(limite, nivel=nivel, tipo=request.args.get("tipo")),
+        "estatisticas": eventos.estatisticas(),
+    }), 200
+
 # ========== WEBHOOK ==========
 @app.route("/webhook", methods=["POST", "HEAD"])
 def responder():
@@ -190,5 +257,5 @@ def responder():
 
 # ========== EXECUÇÃO ==========
 if __name__ == "__main__":
-    print("🟢 Webhook do WhatsApp iniciado e ouvindo na porta padrão do Render...")
+    eventos.info("processo_iniciado", "🟢 Webhook do WhatsApp iniciado e ouvindo na porta padrão do Render...")
     app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 8080)))